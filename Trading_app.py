@@ -2,9 +2,20 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import requests
+import os
 import time
+import uuid
 from datetime import datetime, timedelta
 
+from alerts import ALERT_KINDS, AlertEngine
+from bots import STRATEGIES, BotRuntime
+from charts import candle_payload, candlestick_chart, line_chart, line_payload
+from feed import QuoteFeed
+from market_sim import default_simulator, simulated_history
+from providers import COINGECKO_IDS, CoinGeckoProvider, FMPProvider, HedgedQuoteClient, YahooProvider
+from refresh import RefreshScheduler
+from snapshots import SnapshotStore
+
 # Set page configuration
 st.set_page_config(
     page_title="TradeVision - AI Trading Platform",
@@ -81,75 +92,69 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Alternative data source functions (no yfinance needed)
+# Symbols shown on the dashboard
+CRYPTO_SYMBOLS = ["BTC", "ETH", "ADA", "SOL", "DOGE"]
+STOCK_SYMBOLS = ["AAPL", "TSLA", "NVDA", "SPY", "MSFT", "GOOGL"]
+REFRESH_FLOOR = 15  # Fastest per-symbol refresh interval in seconds
+
+# Offline fallback market
+@st.cache_resource
+def get_demo_market():
+    """Get the shared seeded market simulator used when live data is unavailable"""
+    return default_simulator()
+
+# Price alerts are shared by all sessions and checked on every live quote
+@st.cache_resource
+def get_alert_engine():
+    """Get the shared price-alert engine"""
+    return AlertEngine()
+
+# Refresh pacing per symbol follows market hours and recent volatility
+@st.cache_resource
+def get_refresh_scheduler():
+    """Get the shared refresh scheduler for the dashboard symbols"""
+    scheduler = RefreshScheduler(crypto_interval=REFRESH_FLOOR, regular_interval=REFRESH_FLOOR)
+    scheduler.register(CRYPTO_SYMBOLS, "Crypto")
+    scheduler.register(STOCK_SYMBOLS, "Stocks")
+    return scheduler
+
+# Last known prices are checkpointed to disk so a cold start can draw them at once
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".snapshots")
+
+@st.cache_resource
+def get_snapshot_store():
+    """Load the last checkpoint and keep checkpointing in the background"""
+    store = SnapshotStore(SNAPSHOT_DIR)
+    store.load()
+    store.start()
+    return store
+
+# Alternative data source functions (yfinance is only used as a backup when installed)
+@st.cache_resource
+def get_quote_client():
+    """Get the shared hedged quote client"""
+    return HedgedQuoteClient([CoinGeckoProvider(), FMPProvider(), YahooProvider()])
+
+@st.cache_resource
+def get_quote_feed():
+    """Get the shared quote feed that refreshes symbols on schedule and hands out each live quote"""
+    return QuoteFeed(get_quote_client(), get_refresh_scheduler(), get_alert_engine(), get_snapshot_store(),
+                     get_bot_runtime(), get_demo_market())
+
 def get_crypto_price(symbol):
-    """Get cryptocurrency price from alternative source"""
-    try:
-        # Try to get data from CoinGecko API (no API key needed)
-        if symbol == "BTC":
-            url = "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd"
-            response = requests.get(url, timeout=10)
-            data = response.json()
-            return data['bitcoin']['usd'], True
-        elif symbol == "ETH":
-            url = "https://api.coingecko.com/api/v3/simple/price?ids=ethereum&vs_currencies=usd"
-            response = requests.get(url, timeout=10)
-            data = response.json()
-            return data['ethereum']['usd'], True
-        elif symbol == "ADA":
-            url = "https://api.coingecko.com/api/v3/simple/price?ids=cardano&vs_currencies=usd"
-            response = requests.get(url, timeout=10)
-            data = response.json()
-            return data['cardano']['usd'], True
-        elif symbol == "SOL":
-            url = "https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd"
-            response = requests.get(url, timeout=10)
-            data = response.json()
-            return data['solana']['usd'], True
-    except:
-        pass
-    
-    # Fallback to demo data
-    demo_prices = {
-        "BTC": 37842.12 + (np.random.random() - 0.5) * 1000,
-        "ETH": 2045.67 + (np.random.random() - 0.5) * 50,
-        "ADA": 0.38 + (np.random.random() - 0.5) * 0.05,
-        "SOL": 41.23 + (np.random.random() - 0.5) * 2,
-        "DOGE": 0.08 + (np.random.random() - 0.5) * 0.01
-    }
-    return demo_prices.get(symbol, 100.00), False
+    """Get cryptocurrency price from CoinGecko, hedged to Yahoo Finance"""
+    return get_quote_feed().fetch_quote(symbol, "Crypto")
 
 def get_stock_price(symbol):
-    """Get stock price from alternative source"""
-    try:
-        # Try to get data from Financial Modeling Prep (free tier)
-        if symbol in ["AAPL", "TSLA", "NVDA", "SPY", "MSFT", "GOOGL"]:
-            url = f"https://financialmodelingprep.com/api/v3/quote/{symbol}?apikey=demo"
-            response = requests.get(url, timeout=10)
-            data = response.json()
-            if data and len(data) > 0:
-                return data[0]['price'], True
-    except:
-        pass
-    
-    # Fallback to demo data
-    demo_prices = {
-        "AAPL": 170.00 + (np.random.random() - 0.5) * 2,
-        "TSLA": 250.00 + (np.random.random() - 0.5) * 5,
-        "NVDA": 500.00 + (np.random.random() - 0.5) * 10,
-        "SPY": 450.00 + (np.random.random() - 0.5) * 3,
-        "MSFT": 330.00 + (np.random.random() - 0.5) * 2,
-        "GOOGL": 130.00 + (np.random.random() - 0.5) * 1
-    }
-    return demo_prices.get(symbol, 100.00), False
+    """Get stock price from Financial Modeling Prep, hedged to Yahoo Finance"""
+    return get_quote_feed().fetch_quote(symbol, "Stocks")
 
 def get_stock_data():
     """Get stock data with real prices"""
-    stock_symbols = ["AAPL", "TSLA", "NVDA", "SPY", "MSFT", "GOOGL"]
     stock_data = []
     live_data_count = 0
     
-    for symbol in stock_symbols:
+    for symbol in STOCK_SYMBOLS:
         current_price, is_live = get_stock_price(symbol)
         
         # Calculate random change for demo purposes
@@ -170,11 +175,10 @@ def get_stock_data():
 
 def get_crypto_data():
     """Get cryptocurrency data with real prices"""
-    crypto_symbols = ["BTC", "ETH", "ADA", "SOL", "DOGE"]
     crypto_data = []
     live_data_count = 0
     
-    for symbol in crypto_symbols:
+    for symbol in CRYPTO_SYMBOLS:
         current_price, is_live = get_crypto_price(symbol)
         
         # Calculate random change for demo purposes
@@ -193,6 +197,98 @@ def get_crypto_data():
     
     return crypto_data, live_data_count
 
+def get_snapshot_data(symbols):
+    """Get the last checkpointed prices for a warm start, marked stale"""
+    snapshot_store = get_snapshot_store()
+    snapshot_data = []
+    
+    for symbol in symbols:
+        price, timestamp = snapshot_store.latest.get(symbol, (get_demo_market().quote(symbol), None))
+        snapshot_data.append({
+            "name": symbol,
+            "symbol": symbol,
+            "price": price,
+            "change": 0.0,
+            "is_live": False,
+            "is_stale": timestamp is not None
+        })
+    
+    return snapshot_data
+
+# Chart ranges: (CoinGecko days, FMP interval, simulated bar seconds, simulated bars)
+CHART_RANGES = {
+    "1D": (1, "1min", 60, 1440),
+    "5D": (5, "5min", 300, 1440),
+    "1M": (30, "1hour", 1800, 1440),
+    "1Y": (365, "1day", 86400, 365)
+}
+CHART_WIDTH = 800  # Approximate on-screen chart width in pixels
+
+@st.cache_data(ttl=60)
+def get_price_history(symbol, asset_type, chart_range):
+    """Get price history from CoinGecko or Financial Modeling Prep"""
+    days, interval, sim_dt, sim_bars = CHART_RANGES[chart_range]
+    try:
+        if asset_type == "Crypto" and symbol in COINGECKO_IDS:
+            url = f"https://api.coingecko.com/api/v3/coins/{COINGECKO_IDS[symbol]}/market_chart?vs_currency=usd&days={days}"
+            response = requests.get(url, timeout=10)
+            data = response.json()
+            # CoinGecko only returns closes, so each bar opens at the previous close
+            prices = np.array(data["prices"], dtype=float)
+            close = prices[:, 1]
+            open_ = np.concatenate(([close[0]], close[:-1]))
+            history = pd.DataFrame({
+                "time": pd.to_datetime(prices[:, 0], unit="ms"),
+                "open": open_,
+                "high": np.maximum(open_, close),
+                "low": np.minimum(open_, close),
+                "close": close,
+                "volume": np.array(data["total_volumes"], dtype=float)[:, 1]
+            })
+            return history, True
+        elif asset_type == "Stocks":
+            # Both endpoints take whole dates, so ask for the range and trim to it below
+            end = datetime.now()
+            dates = f"from={(end - timedelta(days=days)).date()}&to={end.date()}"
+            if interval == "1day":
+                url = f"https://financialmodelingprep.com/api/v3/historical-price-full/{symbol}?{dates}&apikey=demo"
+                rows = requests.get(url, timeout=10).json()["historical"]
+            else:
+                url = f"https://financialmodelingprep.com/api/v3/historical-chart/{interval}/{symbol}?{dates}&apikey=demo"
+                rows = requests.get(url, timeout=10).json()
+            if rows:
+                history = pd.DataFrame(rows).rename(columns={"date": "time"})
+                history["time"] = pd.to_datetime(history["time"])
+                history = history.sort_values("time")
+                history = history[history["time"] > history["time"].iloc[-1] - pd.Timedelta(days=days)]
+                return history[["time", "open", "high", "low", "close", "volume"]].reset_index(drop=True), True
+    except:
+        pass
+
+    # Fallback to recorded live quotes for the last day, then simulated history
+    recent_history = get_snapshot_store().recent_history(symbol)
+    if chart_range == "1D" and len(recent_history) > 1:
+        return recent_history, False
+    return simulated_history(get_demo_market(), symbol, sim_bars, sim_dt), False
+
+@st.cache_data(ttl=60)
+def get_chart_payload(symbol, asset_type, chart_range, chart_type, width):
+    """Get price history downsampled to the chart width, cached per symbol, range and width"""
+    history, is_live = get_price_history(symbol, asset_type, chart_range)
+    if chart_type == "Candlestick":
+        return candle_payload(history, width), is_live
+    return line_payload(history, width), is_live
+
+# AI trading bots run in worker processes and receive each live quote as it is fetched
+@st.cache_resource
+def get_bot_runtime():
+    """Start the shared bot runtime with a couple of demo bots"""
+    runtime = BotRuntime()
+    runtime.start()
+    runtime.add_bot("Momentum", symbol="BTC", window=5)
+    runtime.add_bot("Mean Reversion", symbol="AAPL", window=5)
+    return runtime
+
 # Sidebar navigation
 with st.sidebar:
     st.title("TradeVision")
@@ -223,6 +319,15 @@ with st.sidebar:
     st.subheader("Data Status")
     st.markdown('<div class="data-status status-success">Using Public APIs</div>', unsafe_allow_html=True)
     st.markdown('<div class="data-status status-success">No API key required</div>', unsafe_allow_html=True)
+    market_session = get_refresh_scheduler().session(STOCK_SYMBOLS[0])
+    if market_session == "regular":
+        st.markdown('<div class="data-status status-success">US market: Open</div>', unsafe_allow_html=True)
+    elif market_session == "extended":
+        st.markdown('<div class="data-status status-warning">US market: Extended hours</div>', unsafe_allow_html=True)
+    else:
+        market_calendar = get_refresh_scheduler().calendar
+        next_open = datetime.fromtimestamp(market_calendar.next_open(), market_calendar.tz)
+        st.markdown(f'<div class="data-status status-warning">US market: Closed (opens {next_open:%a %H:%M} ET)</div>', unsafe_allow_html=True)
     st.markdown('<div class="data-status status-warning">Some data may be delayed</div>', unsafe_allow_html=True)
 
 # Header
@@ -235,9 +340,20 @@ with col3:
     if st.button("Register", key="register"):
         st.session_state.auth = True
 
-# Get live data
-crypto_data, crypto_live_count = get_crypto_data()
-stock_data, stock_live_count = get_stock_data()
+# Get live data; a new session in a cold or idle process draws the last checkpointed prices first
+snapshot_store = get_snapshot_store()
+last_live_fetch = max((fetched_at for price, fetched_at in get_refresh_scheduler().last_fetch.values()
+                       if price is not None), default=0.0)
+warm_start = ('warm_started' not in st.session_state and len(snapshot_store.latest) > 0
+              and time.time() - last_live_fetch > REFRESH_FLOOR)
+st.session_state.warm_started = True
+
+if warm_start:
+    crypto_data, crypto_live_count = get_snapshot_data(CRYPTO_SYMBOLS), 0
+    stock_data, stock_live_count = get_snapshot_data(STOCK_SYMBOLS), 0
+else:
+    crypto_data, crypto_live_count = get_crypto_data()
+    stock_data, stock_live_count = get_stock_data()
 total_live_data = crypto_live_count + stock_live_count
 total_assets = len(crypto_data) + len(stock_data)
 
@@ -261,7 +377,10 @@ with col4:
     st.markdown(f'<div class="stat-card"><h3>{total_live_data}/{total_assets}</h3><p>Live Data Sources</p></div>', unsafe_allow_html=True)
 
 # Data status indicator
-if total_live_data == total_assets:
+if warm_start:
+    snapshot_time = max(timestamp for price, timestamp in snapshot_store.latest.values())
+    st.info(f"⏳ Showing last known prices from {datetime.fromtimestamp(snapshot_time):%Y-%m-%d %H:%M} - live data is loading")
+elif total_live_data == total_assets:
     st.success("✅ All data is live from external APIs")
 elif total_live_data > 0:
     st.warning(f"⚠️ {total_live_data}/{total_assets} assets using live data (some using demo data)")
@@ -281,7 +400,7 @@ with col1:
     for crypto in crypto_data:
         change_class = "price-up" if crypto["change"] >= 0 else "price-down"
         change_icon = "▲" if crypto["change"] >= 0 else "▼"
-        live_indicator = "✅" if crypto["is_live"] else "📊"
+        live_indicator = "✅" if crypto["is_live"] else "⏳" if crypto.get("is_stale") else "📊"
         
         st.markdown(f"""
         <div class="crypto-item">
@@ -314,7 +433,7 @@ with col1:
     for stock in stock_data:
         change_class = "price-up" if stock["change"] >= 0 else "price-down"
         change_icon = "▲" if stock["change"] >= 0 else "▼"
-        live_indicator = "✅" if stock["is_live"] else "📊"
+        live_indicator = "✅" if stock["is_live"] else "⏳" if stock.get("is_stale") else "📊"
         
         st.markdown(f"""
         <div class="crypto-item">
@@ -362,6 +481,114 @@ with col2:
     if sell_button:
         st.error(f"Sell order placed for {amount} of {asset}")
 
+# The dashboard rows are drawn, so rerun straight away to fetch live data through the normal
+# refresh path; charts and bots wait for that pass instead of blocking on providers here
+if warm_start:
+    st.rerun()
+
+# Price Charts Section
+st.header("Price Charts")
+crypto_symbols = [crypto["symbol"] for crypto in crypto_data]
+col1, col2, col3 = st.columns([2, 2, 1])
+
+with col1:
+    chart_symbol = st.selectbox("Symbol", crypto_symbols + [stock["symbol"] for stock in stock_data])
+with col2:
+    chart_range = st.radio("Range", list(CHART_RANGES), horizontal=True)
+with col3:
+    chart_type = st.radio("Chart Type", ["Line", "Candlestick"])
+
+chart_asset_type = "Crypto" if chart_symbol in crypto_symbols else "Stocks"
+payload, chart_is_live = get_chart_payload(chart_symbol, chart_asset_type, chart_range, chart_type, CHART_WIDTH)
+
+if chart_type == "Candlestick":
+    st.altair_chart(candlestick_chart(payload, CHART_WIDTH), use_container_width=True)
+else:
+    st.altair_chart(line_chart(payload, CHART_WIDTH), use_container_width=True)
+
+if not chart_is_live:
+    st.caption("📊 Offline history - live data unavailable")
+
+# AI Trading Bots Section
+st.header("AI Trading Bots")
+bot_runtime = get_bot_runtime()
+bot_runtime.poll()
+col1, col2 = st.columns([1, 2])
+
+with col1:
+    st.subheader("Launch Bot")
+    
+    with st.form("bot_form"):
+        bot_strategy = st.selectbox("Strategy", list(STRATEGIES))
+        bot_symbol = st.selectbox("Asset", crypto_symbols + [stock["symbol"] for stock in stock_data])
+        bot_amount = st.number_input("Order Size ($)", min_value=0.0, value=100.0, step=10.0)
+        launch_button = st.form_submit_button("Launch")
+    
+    if launch_button:
+        bot_id = bot_runtime.add_bot(bot_strategy, symbol=bot_symbol, amount=bot_amount)
+        st.success(f"Launched {bot_strategy} bot {bot_id} on {bot_symbol}")
+
+with col2:
+    st.subheader("Running Bots")
+    bot_stats = bot_runtime.bot_stats()
+    if bot_stats:
+        st.dataframe(pd.DataFrame(bot_stats), hide_index=True, use_container_width=True)
+    else:
+        st.info("Bots are starting up...")
+    
+    st.subheader("Bot Orders")
+    if bot_runtime.orders:
+        bot_orders = pd.DataFrame(list(bot_runtime.orders)[::-1])
+        bot_orders["time"] = pd.to_datetime(bot_orders["time"], unit="s")
+        st.dataframe(bot_orders, hide_index=True, use_container_width=True)
+    else:
+        st.caption("No bot orders yet")
+
+# Price Alerts Section
+st.header("Price Alerts")
+alert_engine = get_alert_engine()
+if 'alert_owner' not in st.session_state:
+    st.session_state.alert_owner = uuid.uuid4().hex
+    st.session_state.alert_history = []
+col1, col2 = st.columns([1, 2])
+
+with col1:
+    st.subheader("Create Alert")
+    
+    with st.form("alert_form"):
+        alert_symbol = st.selectbox("Asset", crypto_symbols + [stock["symbol"] for stock in stock_data])
+        alert_kind = st.selectbox("Condition", ALERT_KINDS)
+        alert_value = st.number_input("Price ($) or Move (%)", min_value=0.0, value=100.0, step=1.0)
+        create_button = st.form_submit_button("Create Alert")
+    
+    if create_button:
+        try:
+            alert_engine.add_alert(alert_symbol, alert_kind, alert_value, owner=st.session_state.alert_owner)
+            st.success(f"Alert created for {alert_symbol}")
+        except ValueError as e:
+            st.error(str(e))
+
+# Deliver alerts fired since the last rerun
+for notification in alert_engine.notifications(st.session_state.alert_owner):
+    st.toast(f"🔔 {notification['message']}")
+    st.session_state.alert_history.insert(0, notification)
+
+with col2:
+    st.subheader("Active Alerts")
+    my_alerts = alert_engine.alerts_for(st.session_state.alert_owner)
+    if my_alerts:
+        st.dataframe(pd.DataFrame(my_alerts)[["symbol", "kind", "value"]], hide_index=True, use_container_width=True)
+    else:
+        st.caption("No active alerts")
+    
+    st.subheader("Triggered Alerts")
+    if st.session_state.alert_history:
+        alert_history = pd.DataFrame(st.session_state.alert_history)[["time", "message"]]
+        alert_history["time"] = pd.to_datetime(alert_history["time"], unit="s")
+        st.dataframe(alert_history, hide_index=True, use_container_width=True)
+    else:
+        st.caption("No alerts triggered yet")
+
 # AI Art Gallery Section
 st.header("AI Art Gallery")
 if st.button("Generate New Art"):
@@ -397,27 +624,29 @@ st.markdown("<p style='text-align: center; color: #94a3b8;'>This is a demonstrat
 
 # Auto-refresh button
 if st.button("🔄 Refresh Data Now"):
+    get_refresh_scheduler().expire()
     st.rerun()
 
-# Automatic refresh every 60 seconds
+# Automatic refresh when the refresh scheduler has a symbol due
 if 'last_refresh' not in st.session_state:
     st.session_state.last_refresh = time.time()
 
-# Check if 60 seconds have passed since last refresh
-if time.time() - st.session_state.last_refresh > 60:
+# Check if a symbol is due, but never rerun faster than the fastest interval
+seconds_until_refresh = max(get_refresh_scheduler().seconds_until_due(),
+                            REFRESH_FLOOR - (time.time() - st.session_state.last_refresh))
+if seconds_until_refresh <= 0:
     st.session_state.last_refresh = time.time()
     st.rerun()
 
 # Display countdown timer
-seconds_until_refresh = 60 - (time.time() - st.session_state.last_refresh)
 st.sidebar.markdown(f'<div class="refresh-timer">⏱️ Auto-refresh in: {int(seconds_until_refresh)} seconds</div>', unsafe_allow_html=True)
 
 # Data source info
 st.sidebar.markdown("---")
 st.sidebar.info("""
-**Data Sources:** CoinGecko API + Financial Modeling Prep  
+**Data Sources:** CoinGecko API + Financial Modeling Prep (hedged)  
 **No API Key Required**  
 **Rate Limits:** Minimal (free tiers)  
 **Data Delay:** Real-time or slight delay
-**Auto-Refresh:** Every 60 seconds
+**Auto-Refresh:** Per asset, by market hours and volatility
 """)
@@ -0,0 +1,192 @@
+"""Price alerts indexed by sorted thresholds so each quote costs a binary search"""
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+
+ALERT_KINDS = ["Above", "Below", "Crossing", "Percent Move"]
+
+
+class _ThresholdBook:
+    """Alert thresholds for one symbol and direction, kept sorted by level"""
+
+    def __init__(self):
+        self.levels = np.empty(0)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.dead = 0
+        self._pending = []
+
+    def __len__(self):
+        return len(self.levels) + len(self._pending)
+
+    def add(self, level, alert_id):
+        # Inserts are buffered and merged in one pass on the next lookup
+        self._pending.append((level, alert_id))
+
+    def _merge(self):
+        if not self._pending:
+            return
+        self._pending.sort()
+        new_levels = np.array([level for level, _ in self._pending])
+        new_ids = np.array([alert_id for _, alert_id in self._pending], dtype=np.int64)
+        positions = np.searchsorted(self.levels, new_levels, side="right")
+        self.levels = np.insert(self.levels, positions, new_levels)
+        self.ids = np.insert(self.ids, positions, new_ids)
+        self._pending = []
+
+    def crossed_up(self, prev, price):
+        """Get ids with prev < level <= price"""
+        self._merge()
+        lo = np.searchsorted(self.levels, prev, side="right")
+        hi = np.searchsorted(self.levels, price, side="right")
+        return self.ids[lo:hi]
+
+    def crossed_down(self, price, prev):
+        """Get ids with price <= level < prev"""
+        self._merge()
+        lo = np.searchsorted(self.levels, price, side="left")
+        hi = np.searchsorted(self.levels, prev, side="left")
+        return self.ids[lo:hi]
+
+    def compact(self, live):
+        """Drop fired and removed alerts once they make up half the book"""
+        if self.dead * 2 < len(self.levels):
+            return
+        self._merge()
+        keep = live[self.ids]
+        self.levels = self.levels[keep]
+        self.ids = self.ids[keep]
+        self.dead = 0
+
+
+class AlertEngine:
+    """One-shot price alerts checked against every new quote.
+
+    Each symbol has an "up" book of levels that fire when the price rises through
+    them and a "down" book for levels that fire when it falls through them.
+    Above, below, crossing and percent-move alerts become one or two entries in
+    those books. A new quote binary-searches the levels between the previous and
+    new price, so per-tick cost depends on the alerts that fire rather than on
+    how many alerts exist.
+    """
+
+    def __init__(self, max_notifications=100):
+        self.alerts = {}
+        self._by_owner = defaultdict(set)
+        self.last_prices = {}
+        self._books = defaultdict(_ThresholdBook)
+        self._live = np.zeros(1024, dtype=bool)
+        self._ids = itertools.count()
+        self._notifications = defaultdict(lambda: deque(maxlen=max_notifications))
+        self._lock = threading.Lock()
+
+    def add_alert(self, symbol, kind, value, owner=None):
+        """Add an alert; value is a price level, or a percentage for "Percent Move". Returns the alert id"""
+        with self._lock:
+            alert_id = next(self._ids)
+            if alert_id >= len(self._live):
+                self._live = np.concatenate((self._live, np.zeros(len(self._live), dtype=bool)))
+
+            last = self.last_prices.get(symbol)
+            if kind == "Percent Move":
+                if last is None:
+                    raise ValueError(f"No price yet for {symbol} to measure a percent move from")
+                entries = [("up", last * (1 + value / 100)), ("down", last * (1 - value / 100))]
+            elif kind == "Above":
+                entries = [("up", value)]
+            elif kind == "Below":
+                entries = [("down", value)]
+            elif kind == "Crossing":
+                entries = [("up", value), ("down", value)]
+            else:
+                raise ValueError(f"Unknown alert kind: {kind}")
+
+            alert = {
+                "id": alert_id,
+                "symbol": symbol,
+                "kind": kind,
+                "value": value,
+                "owner": owner,
+                "books": [(symbol, direction) for direction, _ in entries],
+                "created": time.time()
+            }
+            self.alerts[alert_id] = alert
+            self._by_owner[owner].add(alert_id)
+            self._live[alert_id] = True
+            for direction, level in entries:
+                self._books[(symbol, direction)].add(level, alert_id)
+
+            # An above/below alert whose condition already holds fires straight away
+            if last is not None and ((kind == "Above" and last >= value) or (kind == "Below" and last <= value)):
+                self._fire(alert, last)
+            return alert_id
+
+    def remove_alert(self, alert_id):
+        """Cancel an alert that has not fired yet"""
+        with self._lock:
+            alert = self.alerts.get(alert_id)
+            if alert is not None and self._live[alert_id]:
+                self._retire(alert)
+
+    def _retire(self, alert):
+        self._live[alert["id"]] = False
+        del self.alerts[alert["id"]]
+        self._by_owner[alert["owner"]].discard(alert["id"])
+        for key in alert["books"]:
+            book = self._books[key]
+            book.dead += 1
+            book.compact(self._live)
+
+    def _fire(self, alert, price):
+        notification = {
+            "id": alert["id"],
+            "time": time.time(),
+            "symbol": alert["symbol"],
+            "kind": alert["kind"],
+            "value": alert["value"],
+            "price": price,
+            "message": f"{alert['symbol']} {alert['kind'].lower()} "
+                       + (f"{alert['value']:g}%" if alert["kind"] == "Percent Move" else f"${alert['value']:,.2f}")
+                       + f" (now ${price:,.2f})"
+        }
+        self._retire(alert)
+        self._notifications[alert["owner"]].append(notification)
+        return notification
+
+    def on_quote(self, symbol, price):
+        """Record a new quote and return the alerts it fired"""
+        with self._lock:
+            prev = self.last_prices.get(symbol)
+            self.last_prices[symbol] = price
+            if prev is None:
+                # First quote: fire the above/below alerts that already hold, as add_alert does once a price exists
+                crossed = np.concatenate((self._books[(symbol, "up")].crossed_up(-np.inf, price),
+                                          self._books[(symbol, "down")].crossed_down(price, np.inf)))
+                crossed = np.unique(crossed[self._live[crossed]])
+                return [self._fire(self.alerts[alert_id], price) for alert_id in crossed.tolist()
+                        if self.alerts[alert_id]["kind"] in ("Above", "Below")]
+            if price == prev:
+                return []
+            if price > prev:
+                crossed = self._books[(symbol, "up")].crossed_up(prev, price)
+            else:
+                crossed = self._books[(symbol, "down")].crossed_down(price, prev)
+
+            fired = []
+            for alert_id in crossed[self._live[crossed]].tolist():
+                fired.append(self._fire(self.alerts[alert_id], price))
+            return fired
+
+    def notifications(self, owner=None):
+        """Take the pending notifications for an owner"""
+        with self._lock:
+            pending = list(self._notifications[owner])
+            self._notifications[owner].clear()
+            return pending
+
+    def alerts_for(self, owner=None):
+        """Get the active alerts for an owner"""
+        with self._lock:
+            return [self.alerts[alert_id] for alert_id in sorted(self._by_owner[owner])]
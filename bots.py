@@ -0,0 +1,374 @@
+"""Process-pool runtime for AI trading bots fed by batched quote updates"""
+import itertools
+import multiprocessing as mp
+import queue
+import signal
+import time
+from collections import deque
+
+
+class Strategy:
+    """Base class for a bot strategy; on_quotes returns a list of (symbol, side, amount) orders.
+
+    Strategies run inside worker processes, so subclasses must live in an
+    importable module and take only picklable constructor arguments.
+    """
+
+    def __init__(self, symbol, amount=100.0):
+        self.symbol = symbol
+        self.amount = amount
+
+    def on_quotes(self, quotes):
+        return []
+
+
+class MomentumStrategy(Strategy):
+    """Buy when the price crosses above its moving average, sell when it crosses below"""
+
+    def __init__(self, symbol, amount=100.0, window=20):
+        super().__init__(symbol, amount)
+        self.prices = deque(maxlen=window)
+        self.position = 0
+
+    def on_quotes(self, quotes):
+        price = quotes.get(self.symbol)
+        if price is None:
+            return []
+        self.prices.append(price)
+        if len(self.prices) < self.prices.maxlen:
+            return []
+        average = sum(self.prices) / len(self.prices)
+        if price > average and self.position <= 0:
+            self.position = 1
+            return [(self.symbol, "Buy", self.amount)]
+        if price < average and self.position >= 0:
+            self.position = -1
+            return [(self.symbol, "Sell", self.amount)]
+        return []
+
+
+class MeanReversionStrategy(Strategy):
+    """Buy when the price is far below its recent mean, sell when far above"""
+
+    def __init__(self, symbol, amount=100.0, window=20, threshold=2.0):
+        super().__init__(symbol, amount)
+        self.prices = deque(maxlen=window)
+        self.threshold = threshold
+
+    def on_quotes(self, quotes):
+        price = quotes.get(self.symbol)
+        if price is None:
+            return []
+        self.prices.append(price)
+        if len(self.prices) < self.prices.maxlen:
+            return []
+        mean = sum(self.prices) / len(self.prices)
+        std = (sum((p - mean) ** 2 for p in self.prices) / len(self.prices)) ** 0.5
+        if std == 0:
+            return []
+        z = (price - mean) / std
+        if z < -self.threshold:
+            return [(self.symbol, "Buy", self.amount)]
+        if z > self.threshold:
+            return [(self.symbol, "Sell", self.amount)]
+        return []
+
+
+STRATEGIES = {
+    "Momentum": MomentumStrategy,
+    "Mean Reversion": MeanReversionStrategy
+}
+
+
+class BotTimeout(Exception):
+    """Raised inside a worker when a bot runs past its hard time limit"""
+
+
+def _raise_timeout(signum, frame):
+    raise BotTimeout()
+
+
+class _BotState:
+    """Scheduling bookkeeping for one bot inside a worker"""
+
+    def __init__(self, bot_id, strategy_cls, kwargs):
+        self.bot_id = bot_id
+        self.strategy_name = getattr(strategy_cls, "__name__", str(strategy_cls))
+        self.symbol = kwargs.get("symbol", "")
+        self.status = "running"
+        self.runs = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.overruns = 0
+        self.consecutive_overruns = 0
+        self.throttled = 0
+        self.orders = 0
+        self.cpu_used = 0.0
+        try:
+            self.strategy = strategy_cls(**kwargs)
+        except Exception as e:
+            # A bot that cannot be built is reported instead of taking its shard down
+            self.strategy = None
+            self.status = f"error: {e}"
+
+    def stats(self):
+        return {
+            "bot_id": self.bot_id,
+            "strategy": self.strategy_name,
+            "symbol": self.symbol,
+            "status": self.status,
+            "runs": self.runs,
+            "avg_ms": self.total_time / self.runs * 1000 if self.runs else 0.0,
+            "max_ms": self.max_time * 1000,
+            "overruns": self.overruns,
+            "throttled": self.throttled,
+            "orders": self.orders
+        }
+
+
+def _worker_main(worker_id, batches, control, output, latency_budget, hard_limit,
+                 cpu_quota, quota_window, max_overruns, stats_interval):
+    """Run one shard of bots against every quote batch until told to stop"""
+    use_timer = hasattr(signal, "setitimer")
+    if use_timer:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+
+    bots = {}
+    schedule = deque()
+    window_start = time.monotonic()
+    last_stats = 0.0
+    batches_run = 0
+    conflated = 0
+    lag = 0.0
+
+    while True:
+        while True:
+            try:
+                command = control.get_nowait()
+            except queue.Empty:
+                break
+            if command[0] == "stop":
+                return
+            if command[0] == "add":
+                _, bot_id, strategy_cls, kwargs = command
+                bots[bot_id] = _BotState(bot_id, strategy_cls, kwargs)
+                schedule.append(bot_id)
+            elif command[0] == "remove" and command[1] in bots:
+                del bots[command[1]]
+                schedule.remove(command[1])
+
+        try:
+            sent_at, quotes = batches.get(timeout=0.1)
+            # Conflate any backlog into the newest prices so a slow shard never falls further behind
+            while True:
+                try:
+                    sent_at, newer = batches.get_nowait()
+                except queue.Empty:
+                    break
+                quotes.update(newer)
+                conflated += 1
+        except queue.Empty:
+            quotes = None
+
+        if quotes is not None:
+            lag = time.time() - sent_at
+            batches_run += 1
+            now = time.monotonic()
+            if now - window_start >= quota_window:
+                for bot in bots.values():
+                    bot.cpu_used = 0.0
+                window_start = now
+
+            for bot_id in schedule:
+                bot = bots[bot_id]
+                if bot.status != "running":
+                    continue
+                if bot.cpu_used >= cpu_quota * quota_window:
+                    bot.throttled += 1
+                    continue
+
+                start = time.perf_counter()
+                cpu_start = time.process_time()
+                orders = []
+                if use_timer:
+                    signal.setitimer(signal.ITIMER_REAL, hard_limit)
+                try:
+                    # Check the shape of every order here, so a malformed one only fails its own bot
+                    orders = [(str(symbol), str(side), float(amount))
+                              for symbol, side, amount in bot.strategy.on_quotes(quotes) or []]
+                except BotTimeout:
+                    bot.status = "killed (hard time limit)"
+                except Exception as e:
+                    bot.status = f"error: {e}"
+                finally:
+                    if use_timer:
+                        signal.setitimer(signal.ITIMER_REAL, 0)
+                elapsed = time.perf_counter() - start
+                bot.cpu_used += time.process_time() - cpu_start
+
+                bot.runs += 1
+                bot.total_time += elapsed
+                bot.max_time = max(bot.max_time, elapsed)
+                if elapsed > latency_budget:
+                    bot.overruns += 1
+                    bot.consecutive_overruns += 1
+                    if bot.consecutive_overruns >= max_overruns and bot.status == "running":
+                        bot.status = "suspended (over latency budget)"
+                else:
+                    bot.consecutive_overruns = 0
+
+                for symbol, side, amount in orders:
+                    bot.orders += 1
+                    output.put(("order", {
+                        "time": time.time(),
+                        "bot_id": bot_id,
+                        "symbol": symbol,
+                        "side": side,
+                        "amount": amount,
+                        "price": quotes.get(symbol)
+                    }))
+
+            # Rotate so every bot takes turns at the front of the batch
+            schedule.rotate(-1)
+
+        if time.monotonic() - last_stats >= stats_interval:
+            last_stats = time.monotonic()
+            output.put(("stats", worker_id, {
+                "batches": batches_run,
+                "conflated": conflated,
+                "lag_ms": lag * 1000,
+                "bots": [bot.stats() for bot in bots.values()]
+            }))
+
+
+class BotRuntime:
+    """Host many bots at once, sharded across worker processes.
+
+    Each worker gets every quote batch through a small bounded queue. When a
+    queue is full, the publisher holds the updates back and merges them into
+    the next batch for that worker, and the worker merges any backlog into the
+    newest prices, so a slow shard sees fresh quotes for every symbol rather
+    than a growing queue.
+    Inside a worker, each bot has a latency budget, with suspension after repeated
+    overruns, a CPU quota per window and a hard time limit. The run order rotates
+    every batch, so no bot is always scheduled last. A worker process that dies
+    anyway is restarted on the next poll or add_bot, with its shard's bots re-added.
+    """
+
+    def __init__(self, n_workers=None, latency_budget=0.005, hard_limit=0.25, cpu_quota=0.1,
+                 quota_window=1.0, max_overruns=5, queue_size=4, stats_interval=1.0):
+        self.n_workers = n_workers or max(1, mp.cpu_count() - 1)
+        self.settings = (latency_budget, hard_limit, cpu_quota, quota_window, max_overruns, stats_interval)
+        self.queue_size = queue_size
+        self._ctx = mp.get_context("spawn")
+        self._batches = [self._ctx.Queue(maxsize=queue_size) for _ in range(self.n_workers)]
+        self._controls = [self._ctx.Queue() for _ in range(self.n_workers)]
+        self._output = self._ctx.Queue()
+        self._workers = []
+        self._shard_of = {}
+        self._specs = {}  # bot_id -> (strategy class, kwargs), to re-add bots to a restarted worker
+        self._shard_sizes = [0] * self.n_workers
+        self._pending = [{} for _ in range(self.n_workers)]  # updates waiting for room in each worker's queue
+        self._pending_since = [0.0] * self.n_workers
+        self._ids = itertools.count(1)
+        self.orders = deque(maxlen=500)
+        self.worker_stats = {}
+        self.held_batches = 0
+        self.worker_restarts = 0
+
+    def _spawn(self, worker_id):
+        worker = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self._batches[worker_id], self._controls[worker_id], self._output) + self.settings,
+            daemon=True
+        )
+        worker.start()
+        return worker
+
+    def start(self):
+        """Start the worker processes"""
+        self._workers = [self._spawn(worker_id) for worker_id in range(self.n_workers)]
+
+    def _revive_workers(self):
+        """Restart any worker process that has died, re-adding the bots of its shard"""
+        for worker_id, worker in enumerate(self._workers):
+            if worker.is_alive():
+                continue
+            # A process that died mid-read may have left its queues locked, so the shard gets new ones
+            self._batches[worker_id] = self._ctx.Queue(maxsize=self.queue_size)
+            self._controls[worker_id] = self._ctx.Queue()
+            for bot_id, shard in self._shard_of.items():
+                if shard == worker_id:
+                    strategy, kwargs = self._specs[bot_id]
+                    self._controls[worker_id].put(("add", bot_id, strategy, kwargs))
+            self.worker_stats.pop(worker_id, None)
+            self._workers[worker_id] = self._spawn(worker_id)
+            self.worker_restarts += 1
+
+    def add_bot(self, strategy, **kwargs):
+        """Add a bot to the least loaded worker; strategy is a STRATEGIES name or Strategy subclass"""
+        if isinstance(strategy, str):
+            strategy = STRATEGIES[strategy]
+        self._revive_workers()
+        bot_id = f"bot-{next(self._ids)}"
+        shard = self._shard_sizes.index(min(self._shard_sizes))
+        self._shard_of[bot_id] = shard
+        self._specs[bot_id] = (strategy, kwargs)
+        self._shard_sizes[shard] += 1
+        self._controls[shard].put(("add", bot_id, strategy, kwargs))
+        return bot_id
+
+    def remove_bot(self, bot_id):
+        """Stop running a bot"""
+        shard = self._shard_of.pop(bot_id)
+        del self._specs[bot_id]
+        self._shard_sizes[shard] -= 1
+        self._controls[shard].put(("remove", bot_id))
+
+    def publish(self, quotes=None):
+        """Send symbol -> price quotes to every worker without blocking; with no quotes, retry held-back updates"""
+        now = time.time()
+        for worker_id, batches in enumerate(self._batches):
+            pending = self._pending[worker_id]
+            if quotes:
+                if not pending:
+                    self._pending_since[worker_id] = now
+                pending.update(quotes)
+            if not pending:
+                continue
+            try:
+                batches.put_nowait((self._pending_since[worker_id], dict(pending)))
+            except queue.Full:
+                # Backpressure: hold the updates and merge them into the next batch rather than stall or drop
+                self.held_batches += 1
+                continue
+            pending.clear()
+
+    def poll(self):
+        """Collect orders and stats from the workers and return the new orders"""
+        self._revive_workers()
+        self.publish()
+        new_orders = []
+        while True:
+            try:
+                message = self._output.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == "order":
+                new_orders.append(message[1])
+                self.orders.append(message[1])
+            elif message[0] == "stats":
+                self.worker_stats[message[1]] = message[2]
+        return new_orders
+
+    def bot_stats(self):
+        """Get the latest scheduling stats for every bot"""
+        return [bot for stats in self.worker_stats.values() for bot in stats["bots"]]
+
+    def stop(self):
+        """Stop the worker processes"""
+        for control in self._controls:
+            control.put(("stop",))
+        for worker in self._workers:
+            worker.join(timeout=5)
+        self._workers = []
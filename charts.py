@@ -0,0 +1,123 @@
+"""Server-side downsampling and chart building for price history"""
+import altair as alt
+import numpy as np
+import pandas as pd
+
+# Candles narrower than this stop being readable, so bucket to width / CANDLE_PX
+CANDLE_PX = 6
+
+
+def _as_float(x):
+    """Convert times or values to a float array LTTB can do geometry on"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: indices of the threshold points that best preserve the shape of y"""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = _as_float(x)
+    y = _as_float(y)
+    every = (n - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Pick the point forming the largest triangle with the previous pick and the next bucket's average
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+
+    return indices
+
+
+def minmax_indices(y, n_buckets):
+    """Min/max-per-pixel bucketing: indices of each bucket's extremes, in order"""
+    n = len(y)
+    if n_buckets * 2 >= n:
+        return np.arange(n)
+
+    y = _as_float(y)
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    picks = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = y[start:end]
+        picks.append(start + int(np.argmin(bucket)))
+        picks.append(start + int(np.argmax(bucket)))
+    return np.unique(picks)
+
+
+def bucket_ohlc(history, n_buckets):
+    """Aggregate an OHLCV frame into at most n_buckets candles"""
+    n = len(history)
+    if n <= n_buckets:
+        return history.reset_index(drop=True)
+
+    starts = np.unique(np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1])
+    ends = np.append(starts[1:], n) - 1
+    return pd.DataFrame({
+        "time": history["time"].to_numpy()[starts],
+        "open": history["open"].to_numpy()[starts],
+        "high": np.maximum.reduceat(history["high"].to_numpy(), starts),
+        "low": np.minimum.reduceat(history["low"].to_numpy(), starts),
+        "close": history["close"].to_numpy()[ends],
+        "volume": np.add.reduceat(history["volume"].to_numpy(), starts)
+    })
+
+
+def line_payload(history, width, method="lttb"):
+    """Reduce a price history to about one point per pixel for a line chart"""
+    if method == "minmax":
+        indices = minmax_indices(history["close"].to_numpy(), max(1, width // 2))
+    else:
+        indices = lttb(history["time"].to_numpy(), history["close"].to_numpy(), width)
+    return history.iloc[indices][["time", "close"]].reset_index(drop=True)
+
+
+def candle_payload(history, width):
+    """Reduce a price history to as many candles as fit in the given width"""
+    return bucket_ohlc(history, max(1, width // CANDLE_PX))
+
+
+def line_chart(payload, width):
+    """Build a line chart from a downsampled payload"""
+    return alt.Chart(payload).mark_line(color="#6366f1").encode(
+        x=alt.X("time:T", title=None),
+        y=alt.Y("close:Q", title="Price ($)", scale=alt.Scale(zero=False)),
+        tooltip=["time:T", alt.Tooltip("close:Q", format=",.2f")]
+    ).properties(width=width, height=320)
+
+
+def candlestick_chart(payload, width):
+    """Build a candlestick chart from a downsampled payload"""
+    color = alt.condition("datum.open <= datum.close", alt.value("#10b981"), alt.value("#ef4444"))
+    base = alt.Chart(payload).encode(
+        x=alt.X("time:T", title=None),
+        color=color,
+        tooltip=["time:T",
+                 alt.Tooltip("open:Q", format=",.2f"), alt.Tooltip("high:Q", format=",.2f"),
+                 alt.Tooltip("low:Q", format=",.2f"), alt.Tooltip("close:Q", format=",.2f")]
+    )
+    wicks = base.mark_rule().encode(
+        y=alt.Y("low:Q", title="Price ($)", scale=alt.Scale(zero=False)),
+        y2="high:Q"
+    )
+    bodies = base.mark_bar(size=max(1, CANDLE_PX - 2)).encode(y="open:Q", y2="close:Q")
+    return (wicks + bodies).properties(width=width, height=320)
@@ -0,0 +1,46 @@
+"""Refresh quotes on schedule and hand each live quote to alerts, snapshots and bots"""
+from providers import QuoteUnavailable
+
+
+class QuoteFeed:
+    """The one quote path both apps share.
+
+    A symbol is fetched only by the caller that claims it from the refresh
+    scheduler once it is due; everyone else gets the outcome of its last
+    fetch. Each live quote is checked against the price alerts, recorded in
+    the snapshot store and published to the bot runtime exactly once. When every provider fails,
+    the fallback simulator's price is returned marked as not live and the
+    symbol is retried at its normal pace.
+    """
+
+    def __init__(self, quote_client, scheduler, alert_engine, snapshot_store, bot_runtime, fallback):
+        self.quote_client = quote_client
+        self.scheduler = scheduler
+        self.alert_engine = alert_engine
+        self.snapshot_store = snapshot_store
+        self.bot_runtime = bot_runtime
+        self.fallback = fallback
+        self.errors = {}  # symbol -> why its last fetch failed
+
+    def fetch_quote(self, symbol, asset_type):
+        """Get (price, is_live) for a symbol, fetching it only if it is due"""
+        if not self.scheduler.claim(symbol):
+            # Not due, or another session is fetching it: reuse the last outcome
+            last_fetch = self.scheduler.last_fetch.get(symbol)
+            if last_fetch is None or last_fetch[0] is None:
+                return self.fallback.quote(symbol), False
+            return last_fetch[0], True
+
+        try:
+            price, _ = self.quote_client.quote(symbol, asset_type)
+        except QuoteUnavailable as e:
+            self.errors[symbol] = str(e)
+            self.scheduler.observe(symbol)
+            return self.fallback.quote(symbol), False
+
+        self.errors.pop(symbol, None)
+        self.alert_engine.on_quote(symbol, price)
+        self.snapshot_store.record(symbol, price)
+        self.bot_runtime.publish({symbol: price})
+        self.scheduler.observe(symbol, price)
+        return price, True
@@ -0,0 +1,313 @@
+"""Seeded market simulator used as the offline fallback and as a load generator"""
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+SECONDS_PER_DAY = 24 * 60 * 60
+SECONDS_PER_YEAR = 365 * SECONDS_PER_DAY
+
+# Random inputs are drawn in fixed blocks of steps, each from its own seed
+BLOCK_STEPS = 64
+INTRADAY, DAILY = 0, 1  # Random streams for steps within a day and for whole days
+
+# The simulated market sits at the base prices at this UTC midnight (2023-11-01)
+EPOCH = 1698796800.0
+
+# Reference levels the demo data has always been centred on
+CRYPTO_BASE_PRICES = {
+    "BTC": 37842.12,
+    "ETH": 2045.67,
+    "ADA": 0.38,
+    "SOL": 41.23,
+    "DOGE": 0.08
+}
+
+STOCK_BASE_PRICES = {
+    "AAPL": 170.00,
+    "TSLA": 250.00,
+    "NVDA": 500.00,
+    "SPY": 450.00,
+    "MSFT": 330.00,
+    "GOOGL": 130.00
+}
+
+
+def block_correlation(group_sizes, within=0.6, across=0.2):
+    """Build a correlation matrix with one correlation level inside each group and another across groups"""
+    n = sum(group_sizes)
+    corr = np.full((n, n), across, dtype=float)
+    start = 0
+    for size in group_sizes:
+        corr[start:start + size, start:start + size] = within
+        start += size
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+
+def intraday_volume_profile(steps_per_day, open_fraction=0.6, close_fraction=0.875):
+    """U-shaped volume weights over a day, peaking at the session open and close"""
+    x = np.linspace(0.0, 1.0, steps_per_day, endpoint=False)
+    session = (x >= open_fraction) & (x < close_fraction)
+    # Position inside the session scaled to [-1, 1] so the U bottoms out mid-session
+    pos = (x - open_fraction) / (close_fraction - open_fraction) * 2.0 - 1.0
+    profile = np.where(session, 1.0 + 2.0 * pos ** 2, 0.3)
+    return profile / profile.mean()
+
+
+class MarketSimulator:
+    """Correlated geometric Brownian motion with Poisson jumps and intraday volume.
+
+    The path is a fixed function of absolute time for a given seed. A daily
+    path starts from the base prices at the epoch and carries forward day after
+    day; with reversion_halflife (in days) set, each day's log price is pulled
+    back toward its base level, so prices stay realistic however far from the
+    epoch they are read. Each day's steps are a Brownian bridge between that
+    day's midnight price and the next one, so the market never resets. Random
+    inputs are drawn in blocks seeded by absolute step (or day) number, so any
+    window of time gives the same prices however it is queried. Each block
+    covers every symbol in one NumPy operation, so thousands of symbols are cheap.
+    """
+
+    def __init__(self, symbols, prices, volatility, correlation=None, drift=0.0,
+                 dt=60.0, seed=42, jump_intensity=4.0, jump_mean=0.0, jump_std=0.03,
+                 base_volume=1_000_000.0, volume_profile=None, epoch=EPOCH, start_time=None,
+                 day_cache_size=8, reversion_halflife=None):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        n = len(self.symbols)
+
+        self.base_prices = np.asarray(prices, dtype=float).copy()
+        self.volatility = np.broadcast_to(np.asarray(volatility, dtype=float), (n,)).copy()
+        self.drift = np.broadcast_to(np.asarray(drift, dtype=float), (n,)).copy()
+        self.base_volume = np.broadcast_to(np.asarray(base_volume, dtype=float), (n,)).copy()
+
+        if correlation is None:
+            correlation = np.eye(n)
+        self._chol = np.linalg.cholesky(np.asarray(correlation, dtype=float))
+
+        self.dt = float(dt)
+        self.steps_per_day = int(round(SECONDS_PER_DAY / self.dt))
+        if self.steps_per_day * self.dt != SECONDS_PER_DAY:
+            raise ValueError(f"dt must divide a day evenly, got {dt}")
+        self.jump_intensity = jump_intensity  # expected jumps per symbol per year
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+        # Share of a day's deviation from the base price that carries into the next day
+        self.persistence = 1.0 if reversion_halflife is None else 0.5 ** (1.0 / reversion_halflife)
+        self.seed = seed
+        self._cached_blocks = {}
+
+        if volume_profile is None:
+            volume_profile = intraday_volume_profile(self.steps_per_day)
+        self.volume_profile = np.asarray(volume_profile, dtype=float)
+
+        self._epoch_day = int(epoch // SECONDS_PER_DAY)
+        self._anchors = None
+        self._anchors_first_day = None
+        self._day_paths = OrderedDict()
+        self._day_cache_size = day_cache_size
+
+        if start_time is None:
+            start_time = time.time()
+        self.time = start_time // self.dt * self.dt
+        self.prices, self.last_volumes = (row[0] for row in self._path([int(self.time // self.dt)]))
+        self._lock = threading.RLock()
+
+    @classmethod
+    def random_universe(cls, n_symbols, seed=0, sector_size=50, **kwargs):
+        """Create a large synthetic universe for load testing the data paths"""
+        rng = np.random.default_rng(seed)
+        symbols = [f"SIM{i:05d}" for i in range(n_symbols)]
+        prices = rng.lognormal(mean=4.0, sigma=1.0, size=n_symbols)
+        volatility = rng.uniform(0.15, 0.9, size=n_symbols)
+        sectors = [sector_size] * (n_symbols // sector_size)
+        if n_symbols % sector_size:
+            sectors.append(n_symbols % sector_size)
+        correlation = block_correlation(sectors, within=0.5, across=0.15)
+        return cls(symbols, prices, volatility, correlation=correlation, seed=seed, **kwargs)
+
+    def _block(self, stream, b):
+        """Draw the random inputs for block b of a stream; seeded by block number so paths never depend on call pattern"""
+        cached = self._cached_blocks.get(stream)
+        if cached is not None and cached[0] == b:
+            return cached[1]
+        step_seconds = self.dt if stream == INTRADAY else SECONDS_PER_DAY
+        rng = np.random.default_rng([self.seed, stream, b])
+        shape = (BLOCK_STEPS, len(self.symbols))
+        draws = (
+            rng.standard_normal(shape) @ self._chol.T,
+            rng.poisson(self.jump_intensity * step_seconds / SECONDS_PER_YEAR, shape),
+            rng.standard_normal(shape),
+            rng.lognormal(0.0, 0.3, shape)
+        )
+        self._cached_blocks[stream] = (b, draws)
+        return draws
+
+    def _draws(self, stream, start, n_steps):
+        """Slice the random inputs for absolute steps [start, start + n_steps) of a stream"""
+        first = start // BLOCK_STEPS
+        last = (start + n_steps - 1) // BLOCK_STEPS
+        blocks = [self._block(stream, b) for b in range(first, last + 1)]
+        offset = start - first * BLOCK_STEPS
+        return [np.concatenate(parts)[offset:offset + n_steps] for parts in zip(*blocks)]
+
+    def _increments(self, stream, start, n_steps, with_drift):
+        """Get log-return increments and volume noise for absolute steps of a stream"""
+        shocks, jump_counts, jump_noise, volume_noise = self._draws(stream, start, n_steps)
+        step_seconds = self.dt if stream == INTRADAY else SECONDS_PER_DAY
+        dt_years = step_seconds / SECONDS_PER_YEAR
+        increments = self.volatility * np.sqrt(dt_years) * shocks
+        # Compound Poisson jumps: k jumps in a step sum to N(k * mean, k * std^2)
+        increments += self.jump_mean * jump_counts + self.jump_std * np.sqrt(jump_counts) * jump_noise
+        if with_drift:
+            increments += (self.drift - 0.5 * self.volatility ** 2) * dt_years
+        return increments, volume_noise
+
+    def _anchor_logs(self, first_day, last_day):
+        """Get log prices at UTC midnight for absolute days first_day..last_day"""
+        cached_last = None if self._anchors is None else self._anchors_first_day + len(self._anchors) - 1
+        if self._anchors is None or first_day < self._anchors_first_day or last_day > cached_last:
+            # Cover the epoch and leave headroom so the next few days do not recompute
+            lo = min(first_day, self._epoch_day, self._anchors_first_day or first_day)
+            hi = max(last_day, self._epoch_day, cached_last or last_day) + 30
+            increments, _ = self._increments(DAILY, lo, hi - lo, with_drift=True)
+            # Log deviation from the base prices, zero at the epoch, walked forward and back from there
+            deviation = np.zeros((hi - lo + 1, len(self.symbols)))
+            epoch_row = self._epoch_day - lo
+            for d in range(epoch_row, hi - lo):
+                deviation[d + 1] = self.persistence * deviation[d] + increments[d]
+            for d in range(epoch_row - 1, -1, -1):
+                deviation[d] = self.persistence * deviation[d + 1] - increments[d]
+            self._anchors = np.log(self.base_prices) + deviation
+            self._anchors_first_day = lo
+        offset = first_day - self._anchors_first_day
+        return self._anchors[offset:offset + last_day - first_day + 1]
+
+    def _day_path(self, day):
+        """Get (log prices, volume noise) at each step of an absolute day, pinned to its midnight anchors"""
+        if day in self._day_paths:
+            self._day_paths.move_to_end(day)
+            return self._day_paths[day]
+        steps = self.steps_per_day
+        start_log, end_log = self._anchor_logs(day, day + 1)
+        increments, volume_noise = self._increments(INTRADAY, day * steps, steps, with_drift=False)
+        walk = np.vstack((np.zeros((1, len(self.symbols))), np.cumsum(increments, axis=0)))
+        frac = (np.arange(steps + 1) / steps)[:, None]
+        logs = start_log + frac * (end_log - start_log) + walk - frac * walk[-1]
+        self._day_paths[day] = (logs[:steps], volume_noise)
+        while len(self._day_paths) > self._day_cache_size:
+            self._day_paths.popitem(last=False)
+        return self._day_paths[day]
+
+    def _path(self, steps, bar_seconds=None):
+        """Get (prices, volumes), each shaped (len(steps), symbols), at absolute step numbers.
+
+        Volumes cover one step, or a bar of bar_seconds: bars of a day or more
+        take their day's total and shorter bars scale the step's volume.
+        """
+        steps = np.asarray(steps, dtype=np.int64)
+        bar_steps = 1.0 if bar_seconds is None else bar_seconds / self.dt
+        days = steps // self.steps_per_day
+        slots = steps % self.steps_per_day
+        prices = np.empty((len(steps), len(self.symbols)))
+        volumes = np.empty_like(prices)
+        for day in np.unique(days).tolist():
+            rows = np.flatnonzero(days == day)
+            row_slots = slots[rows]
+            # Midnights sit on the daily path, so only other times need the day's intraday path
+            midnight = row_slots == 0
+            prices[rows[midnight]] = np.exp(self._anchor_logs(day, day)[0])
+            if midnight.all():
+                volume_noise = self._draws(INTRADAY, day * self.steps_per_day, 1)[3]
+            else:
+                logs, volume_noise = self._day_path(day)
+                prices[rows[~midnight]] = np.exp(logs[row_slots[~midnight]])
+            if bar_steps >= self.steps_per_day:
+                volumes[rows] = self.base_volume * bar_steps * self._draws(DAILY, day, 1)[3][0]
+            else:
+                volumes[rows] = self.base_volume * bar_steps * self.volume_profile[row_slots][:, None] \
+                    * volume_noise[row_slots]
+        return prices, volumes
+
+    def prices_at(self, timestamps, bar_seconds=None):
+        """Get simulated (prices, volumes) at the given times, each shaped (len(timestamps), symbols).
+
+        Volumes cover one simulator step, or bars of bar_seconds if given.
+        """
+        steps = np.floor(np.asarray(timestamps, dtype=float) / self.dt).astype(np.int64)
+        with self._lock:
+            return self._path(steps, bar_seconds)
+
+    def step(self, n_steps=1):
+        """Advance every symbol n_steps at once and return (prices, volumes), each shaped (n_steps, symbols)"""
+        with self._lock:
+            first = int(self.time // self.dt) + 1
+            paths, volumes = self._path(np.arange(first, first + n_steps))
+            self.prices = paths[-1].copy()
+            self.last_volumes = volumes[-1].copy()
+            self.time += n_steps * self.dt
+        return paths, volumes
+
+    def advance_to(self, timestamp=None):
+        """Move the simulation to the given time (defaults to now)"""
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            target = timestamp // self.dt * self.dt
+            if target > self.time:
+                self.time = target
+                self.prices, self.last_volumes = (row[0] for row in self._path([int(target // self.dt)]))
+
+    def quote(self, symbol, default=100.00):
+        """Get the simulated price of a symbol at the current time"""
+        self.advance_to()
+        i = self.index.get(symbol)
+        if i is None:
+            return default
+        return float(self.prices[i])
+
+    def snapshot(self):
+        """Get the current prices as a symbol -> price dict"""
+        self.advance_to()
+        return dict(zip(self.symbols, self.prices.tolist()))
+
+
+def default_simulator(seed=42, **kwargs):
+    """Create the simulator covering the app's crypto and stock symbols"""
+    symbols = list(CRYPTO_BASE_PRICES) + list(STOCK_BASE_PRICES)
+    prices = list(CRYPTO_BASE_PRICES.values()) + list(STOCK_BASE_PRICES.values())
+    volatility = [0.65, 0.75, 0.95, 1.05, 1.10] + [0.28, 0.60, 0.50, 0.16, 0.26, 0.30]
+    correlation = block_correlation([len(CRYPTO_BASE_PRICES), len(STOCK_BASE_PRICES)],
+                                    within=0.6, across=0.15)
+    # Drift offsets volatility drag and a two-month reversion half-life keeps prices near the base levels
+    drift = 0.5 * np.square(volatility)
+    kwargs.setdefault("reversion_halflife", 60)
+    return MarketSimulator(symbols, prices, volatility, correlation=correlation, drift=drift, seed=seed, **kwargs)
+
+
+def simulated_history(sim, symbol, n_bars, bar_seconds=60.0, end_time=None):
+    """Get n_bars OHLCV bars of bar_seconds ending at end_time, read from the simulator's path"""
+    columns = ["time", "open", "high", "low", "close", "volume"]
+    if symbol not in sim.index:
+        return pd.DataFrame(columns=columns)
+    if end_time is None:
+        end_time = time.time()
+    times = end_time // bar_seconds * bar_seconds - bar_seconds * np.arange(n_bars - 1, -1, -1)
+    # Finish on the current moment so the last close matches the simulator's live quote
+    if end_time > times[-1]:
+        times = np.append(times[1:], end_time)
+    prices, volumes = sim.prices_at(times, bar_seconds)
+    i = sim.index[symbol]
+    close = prices[:, i]
+    open_ = np.concatenate((close[:1], close[:-1]))
+    return pd.DataFrame({
+        "time": pd.to_datetime(times, unit="s"),
+        "open": open_,
+        "high": np.maximum(open_, close),
+        "low": np.minimum(open_, close),
+        "close": close,
+        "volume": volumes[:, i]
+    })
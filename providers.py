@@ -0,0 +1,211 @@
+"""Quote providers behind one interface, with hedged requests across them"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+import requests
+
+try:
+    import yfinance as yf
+except ImportError:  # Trading_app.py runs without yfinance
+    yf = None
+
+COINGECKO_IDS = {
+    "BTC": "bitcoin",
+    "ETH": "ethereum",
+    "ADA": "cardano",
+    "SOL": "solana",
+    "DOGE": "dogecoin"
+}
+
+
+class QuoteUnavailable(Exception):
+    """Raised when no provider could return a quote"""
+
+
+class QuoteProvider:
+    """Base class for a quote backend; fetch returns a price or raises, giving up after timeout seconds"""
+    name = "provider"
+    timeout = 10
+
+    def supports(self, symbol, asset_type):
+        return True
+
+    def fetch(self, symbol, asset_type, timeout=None):
+        raise NotImplementedError
+
+
+class YahooProvider(QuoteProvider):
+    """Yahoo Finance via yfinance (stocks and crypto)"""
+    name = "Yahoo Finance"
+
+    def supports(self, symbol, asset_type):
+        return yf is not None
+
+    def fetch(self, symbol, asset_type, timeout=None):
+        # Yahoo Finance uses different symbols (BTC-USD instead of BTC/USD)
+        ticker = yf.Ticker(f"{symbol}-USD" if asset_type == "Crypto" else symbol)
+        data = ticker.history(period="1d", interval="1m", timeout=timeout or self.timeout)
+        if not data.empty:
+            return float(data['Close'].iloc[-1])
+        # Fallback to info if history is empty
+        info = ticker.info
+        if 'regularMarketPrice' in info:
+            return float(info['regularMarketPrice'])
+        raise QuoteUnavailable(f"{self.name} has no price for {symbol}")
+
+
+class CoinGeckoProvider(QuoteProvider):
+    """CoinGecko simple price API (crypto only, no API key needed)"""
+    name = "CoinGecko"
+
+    def supports(self, symbol, asset_type):
+        return asset_type == "Crypto" and symbol in COINGECKO_IDS
+
+    def fetch(self, symbol, asset_type, timeout=None):
+        coin_id = COINGECKO_IDS[symbol]
+        url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=usd"
+        response = requests.get(url, timeout=timeout or self.timeout)
+        return float(response.json()[coin_id]['usd'])
+
+
+class FMPProvider(QuoteProvider):
+    """Financial Modeling Prep quote API (stocks only, free tier)"""
+    name = "Financial Modeling Prep"
+
+    def __init__(self, api_key="demo"):
+        self.api_key = api_key
+
+    def supports(self, symbol, asset_type):
+        return asset_type == "Stocks"
+
+    def fetch(self, symbol, asset_type, timeout=None):
+        url = f"https://financialmodelingprep.com/api/v3/quote/{symbol}?apikey={self.api_key}"
+        response = requests.get(url, timeout=timeout or self.timeout)
+        data = response.json()
+        if data and len(data) > 0:
+            return float(data[0]['price'])
+        raise QuoteUnavailable(f"{self.name} has no price for {symbol}")
+
+
+class LatencyTracker:
+    """Rolling window of successful response times for one provider"""
+
+    def __init__(self, window=200):
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, q, default):
+        with self._lock:
+            if len(self.samples) < 20:
+                return default
+            return float(np.percentile(self.samples, q))
+
+
+class HedgedQuoteClient:
+    """Send each quote to the first provider, hedging to the next one if it is slow.
+
+    A backup request only goes out once the in-flight request has run past
+    that provider's p95 latency, so about one request in twenty is hedged.
+    A hedge budget caps backups at a fraction of all requests, which keeps
+    average upstream load close to one call per quote even when a provider
+    degrades. The first successful answer wins. A request that has already
+    started cannot be interrupted, so the losers are abandoned rather than
+    cancelled; each is sent with a timeout no later than the quote's own
+    deadline, and the pool has a thread per provider for every concurrent
+    quote so abandoned requests cannot starve new ones.
+    """
+
+    def __init__(self, providers, hedge_percentile=95, default_hedge_delay=1.0,
+                 min_hedge_delay=0.05, hedge_budget=0.1, hedge_burst=5, timeout=10.0,
+                 max_concurrent_quotes=16):
+        self.providers = list(providers)
+        self.latency = {provider.name: LatencyTracker() for provider in self.providers}
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.hedge_budget = hedge_budget
+        self.hedge_burst = hedge_burst  # hedges allowed before the budget has built up
+        self.timeout = timeout
+        self.requests_sent = 0
+        self.hedges_sent = 0
+        self.wins = {provider.name: 0 for provider in self.providers}
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_quotes * len(self.providers),
+                                            thread_name_prefix="quote")
+        self._lock = threading.Lock()
+
+    def hedge_delay(self, provider):
+        """Get how long to wait on a provider before sending a backup request"""
+        delay = self.latency[provider.name].percentile(self.hedge_percentile, self.default_hedge_delay)
+        return max(delay, self.min_hedge_delay)
+
+    def _timed_fetch(self, provider, symbol, asset_type, timeout):
+        start = time.monotonic()
+        price = provider.fetch(symbol, asset_type, timeout=timeout)
+        self.latency[provider.name].record(time.monotonic() - start)
+        return price
+
+    def _submit(self, provider, symbol, asset_type, in_flight, deadline):
+        # Whatever happens to this request, it gives up by the quote's deadline
+        timeout = max(deadline - time.monotonic(), 0.1)
+        future = self._executor.submit(self._timed_fetch, provider, symbol, asset_type, timeout)
+        in_flight[future] = provider
+        with self._lock:
+            self.requests_sent += 1
+
+    def _may_hedge(self):
+        with self._lock:
+            if self.hedges_sent >= self.hedge_budget * self.requests_sent + self.hedge_burst:
+                return False
+            self.hedges_sent += 1
+            return True
+
+    def quote(self, symbol, asset_type):
+        """Get (price, provider name) from whichever provider answers first"""
+        candidates = [p for p in self.providers if p.supports(symbol, asset_type)]
+        if not candidates:
+            raise QuoteUnavailable(f"No provider supports {symbol}")
+
+        deadline = time.monotonic() + self.timeout
+        in_flight = {}
+        errors = []
+        self._submit(candidates.pop(0), symbol, asset_type, in_flight, deadline)
+
+        while in_flight:
+            wait_for = deadline - time.monotonic()
+            if wait_for <= 0:
+                break
+            if candidates:
+                wait_for = min(wait_for, min(self.hedge_delay(p) for p in in_flight.values()))
+            done, _ = wait(in_flight, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                provider = in_flight.pop(future)
+                try:
+                    price = future.result()
+                except Exception as e:
+                    errors.append(f"{provider.name}: {e}")
+                    continue
+                # Only requests still queued can be cancelled; running ones run out their timeout
+                for other in in_flight:
+                    other.cancel()
+                with self._lock:
+                    self.wins[provider.name] += 1
+                return price, provider.name
+
+            if candidates:
+                if not in_flight:
+                    # Everything in flight failed, so fail over without spending hedge budget
+                    self._submit(candidates.pop(0), symbol, asset_type, in_flight, deadline)
+                elif not done and self._may_hedge():
+                    self._submit(candidates.pop(0), symbol, asset_type, in_flight, deadline)
+
+        for future in in_flight:
+            future.cancel()
+        raise QuoteUnavailable(f"No quote for {symbol}: " + ("; ".join(errors) or "timed out"))
@@ -0,0 +1,217 @@
+"""Market-hours-aware refresh scheduling per symbol"""
+import math
+import threading
+import time
+from datetime import date, datetime, timedelta
+from datetime import time as dtime
+from zoneinfo import ZoneInfo
+
+# Full-day NYSE closures
+NYSE_HOLIDAYS = {
+    date(2025, 1, 1), date(2025, 1, 9), date(2025, 1, 20), date(2025, 2, 17), date(2025, 4, 18),
+    date(2025, 5, 26), date(2025, 6, 19), date(2025, 7, 4), date(2025, 9, 1), date(2025, 11, 27),
+    date(2025, 12, 25),
+    date(2026, 1, 1), date(2026, 1, 19), date(2026, 2, 16), date(2026, 4, 3), date(2026, 5, 25),
+    date(2026, 6, 19), date(2026, 7, 3), date(2026, 9, 7), date(2026, 11, 26), date(2026, 12, 25),
+    date(2027, 1, 1), date(2027, 1, 18), date(2027, 2, 15), date(2027, 3, 26), date(2027, 5, 31),
+    date(2027, 6, 18), date(2027, 7, 5), date(2027, 9, 6), date(2027, 11, 25), date(2027, 12, 24)
+}
+
+# NYSE half days, closing at 13:00
+NYSE_EARLY_CLOSES = {
+    date(2025, 7, 3), date(2025, 11, 28), date(2025, 12, 24),
+    date(2026, 11, 27), date(2026, 12, 24),
+    date(2027, 11, 26)
+}
+
+
+class ExchangeCalendar:
+    """Regular and extended trading sessions of a US equity exchange"""
+
+    def __init__(self, tz="America/New_York", pre_open=dtime(4, 0), regular_open=dtime(9, 30),
+                 regular_close=dtime(16, 0), early_close=dtime(13, 0), post_close=dtime(20, 0),
+                 holidays=NYSE_HOLIDAYS, early_closes=NYSE_EARLY_CLOSES):
+        self.tz = ZoneInfo(tz)
+        self.pre_open = pre_open
+        self.regular_open = regular_open
+        self.regular_close = regular_close
+        self.early_close = early_close
+        self.post_close = post_close
+        self.holidays = holidays
+        self.early_closes = early_closes
+
+    def is_trading_day(self, day):
+        return day.weekday() < 5 and day not in self.holidays
+
+    def _boundaries(self, day):
+        """Get (pre-market start, open, close, post-market end) for a trading day as timestamps"""
+        close = self.early_close if day in self.early_closes else self.regular_close
+        post_close = dtime(close.hour + 4, close.minute)
+        return [datetime.combine(day, t, self.tz).timestamp()
+                for t in (self.pre_open, self.regular_open, close, min(post_close, self.post_close))]
+
+    def session(self, timestamp=None):
+        """Get "regular", "extended" or "closed" for a moment in time"""
+        if timestamp is None:
+            timestamp = time.time()
+        day = datetime.fromtimestamp(timestamp, self.tz).date()
+        if not self.is_trading_day(day):
+            return "closed"
+        pre_open, regular_open, close, post_close = self._boundaries(day)
+        if regular_open <= timestamp < close:
+            return "regular"
+        if pre_open <= timestamp < post_close:
+            return "extended"
+        return "closed"
+
+    def next_boundary(self, timestamp=None):
+        """Get the timestamp of the next session change"""
+        if timestamp is None:
+            timestamp = time.time()
+        day = datetime.fromtimestamp(timestamp, self.tz).date()
+        # Long weekends plus a holiday never span more than a week
+        for offset in range(10):
+            candidate = day + timedelta(days=offset)
+            if not self.is_trading_day(candidate):
+                continue
+            for boundary in self._boundaries(candidate):
+                if boundary > timestamp:
+                    return boundary
+        return timestamp + 24 * 60 * 60
+
+    def next_open(self, timestamp=None):
+        """Get the timestamp of the next regular-session open"""
+        if timestamp is None:
+            timestamp = time.time()
+        day = datetime.fromtimestamp(timestamp, self.tz).date()
+        for offset in range(10):
+            candidate = day + timedelta(days=offset)
+            if self.is_trading_day(candidate):
+                regular_open = self._boundaries(candidate)[1]
+                if regular_open > timestamp:
+                    return regular_open
+        return timestamp + 24 * 60 * 60
+
+
+class RefreshScheduler:
+    """Decide when each symbol next needs a fresh quote.
+
+    Crypto trades around the clock and refreshes at a fast fixed pace. Stocks
+    refresh fast in the regular session and more slowly in pre/post-market. While
+    the exchange is closed they wait until the next session starts, up to
+    closed_max_interval. Within a session, a symbol whose recent moves are small
+    compared with its longer-run average backs off by up to max_quiet_backoff.
+    A caller claims a due symbol before fetching it, so concurrent sessions never
+    fetch the same symbol twice; an unfinished claim lapses after fetch_timeout.
+    """
+
+    def __init__(self, calendar=None, crypto_interval=15, regular_interval=15, extended_interval=120,
+                 closed_max_interval=1800, max_quiet_backoff=4.0, short_halflife=5, long_halflife=60,
+                 fetch_timeout=30):
+        self.calendar = calendar or ExchangeCalendar()
+        self.crypto_interval = crypto_interval
+        self.regular_interval = regular_interval
+        self.extended_interval = extended_interval
+        self.closed_max_interval = closed_max_interval
+        self.max_quiet_backoff = max_quiet_backoff
+        self.fetch_timeout = fetch_timeout
+        self.short_alpha = 1 - 0.5 ** (1 / short_halflife)
+        self.long_alpha = 1 - 0.5 ** (1 / long_halflife)
+        self.asset_types = {}
+        self.next_due = {}
+        self.last_fetch = {}  # symbol -> (price, time) of the last refresh attempt; price is None if it failed
+        self._activity = {}  # symbol -> [last price, last time, short variance, long variance, samples]
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def register(self, symbols, asset_type):
+        """Add symbols of one asset type ("Crypto" or "Stocks"); they are due immediately"""
+        with self._lock:
+            for symbol in symbols:
+                self.asset_types[symbol] = asset_type
+                self.next_due.setdefault(symbol, 0.0)
+
+    def session(self, symbol, now=None):
+        """Get the trading session a symbol is in"""
+        if self.asset_types.get(symbol) == "Crypto":
+            return "24/7"
+        return self.calendar.session(now)
+
+    def quiet_backoff(self, symbol):
+        """Get how much to stretch a symbol's interval because it is moving less than usual"""
+        activity = self._activity.get(symbol)
+        if activity is None or activity[4] < 3 or activity[3] <= 0:
+            return 1.0
+        ratio = math.sqrt(activity[2] / activity[3])
+        return min(self.max_quiet_backoff, max(1.0, 1.0 / ratio if ratio > 0 else self.max_quiet_backoff))
+
+    def interval(self, symbol, now=None):
+        """Get the seconds to wait before refreshing a symbol again"""
+        if now is None:
+            now = time.time()
+        session = self.session(symbol, now)
+        if session == "24/7":
+            return self.crypto_interval * self.quiet_backoff(symbol)
+
+        until_change = self.calendar.next_boundary(now) - now
+        if session == "closed":
+            # Prices cannot move until the next session, so just wake up for it
+            return max(1.0, min(self.closed_max_interval, until_change))
+        base = self.regular_interval if session == "regular" else self.extended_interval
+        return max(1.0, min(base * self.quiet_backoff(symbol), until_change))
+
+    def observe(self, symbol, price=None, now=None):
+        """Record a refresh attempt (price is None if it failed) and schedule the next one"""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            if price is not None and price > 0:
+                activity = self._activity.get(symbol)
+                if activity is None:
+                    self._activity[symbol] = [price, now, 0.0, 0.0, 0]
+                elif now > activity[1]:
+                    # Squared log return per second, smoothed over a short and a long horizon
+                    variance = math.log(price / activity[0]) ** 2 / (now - activity[1])
+                    if activity[4] == 0:
+                        activity[2] = activity[3] = variance
+                    else:
+                        activity[2] += self.short_alpha * (variance - activity[2])
+                        activity[3] += self.long_alpha * (variance - activity[3])
+                    activity[0], activity[1] = price, now
+                    activity[4] += 1
+            self.last_fetch[symbol] = (price if price is not None and price > 0 else None, now)
+            self.next_due[symbol] = now + self.interval(symbol, now)
+            self._in_flight.discard(symbol)
+
+    def due(self, symbol, now=None):
+        """Check whether a symbol should be refreshed now"""
+        if now is None:
+            now = time.time()
+        return self.next_due.get(symbol, 0.0) <= now
+
+    def claim(self, symbol, now=None):
+        """Take a due symbol for refreshing; returns False if it is not due or another caller is fetching it"""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            if self.next_due.get(symbol, 0.0) > now:
+                return False
+            # Hold the slot until observe() reports back, or the fetch is given up on
+            self.next_due[symbol] = now + self.fetch_timeout
+            self._in_flight.add(symbol)
+            return True
+
+    def expire(self, symbols=None):
+        """Make symbols (all by default) due now, leaving any being fetched alone"""
+        with self._lock:
+            for symbol in self.next_due if symbols is None else symbols:
+                if symbol not in self._in_flight:
+                    self.next_due[symbol] = 0.0
+
+    def seconds_until_due(self, now=None):
+        """Get the seconds until the next symbol is due (0 if one already is)"""
+        if now is None:
+            now = time.time()
+        if not self.next_due:
+            return 0.0
+        return max(0.0, min(self.next_due.values()) - now)
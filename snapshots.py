@@ -0,0 +1,140 @@
+"""Checkpoint the latest quotes and recent history to disk for warm starts"""
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+QUOTE_DTYPE = np.dtype([("symbol", "U16"), ("price", "f8"), ("time", "f8")])
+HISTORY_DTYPE = np.dtype([("symbol", "U16"), ("time", "f8"), ("price", "f8")])
+
+
+def _atomic_save(path, array):
+    """Write an array next to path and rename it into place, so readers never see a partial file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _load(path):
+    """Read a checkpoint, or return None if there is none"""
+    try:
+        return np.load(path)
+    except (OSError, ValueError):
+        return None
+
+
+class SnapshotStore:
+    """Latest live quote and recent history per symbol, checkpointed as .npy files.
+
+    Checkpoints are written periodically by a background thread, and only when
+    something changed. Each file is replaced atomically. At startup they are
+    read back so the first render can draw the last known prices at once.
+    """
+
+    def __init__(self, directory, history_size=390, interval=30.0):
+        self.directory = directory
+        self.history_size = history_size
+        self.interval = interval
+        self.latest = {}
+        self.history = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def quotes_path(self):
+        return os.path.join(self.directory, "quotes.npy")
+
+    @property
+    def history_path(self):
+        return os.path.join(self.directory, "history.npy")
+
+    def load(self):
+        """Load the last checkpoint, if any, and return how many symbols it had"""
+        quotes = _load(self.quotes_path)
+        history = _load(self.history_path)
+        with self._lock:
+            if quotes is not None:
+                for row in quotes:
+                    self.latest[str(row["symbol"])] = (float(row["price"]), float(row["time"]))
+            if history is not None and len(history):
+                # History is stored grouped by symbol, so each group is one contiguous slice
+                _, starts = np.unique(history["symbol"], return_index=True)
+                bounds = np.append(np.sort(starts), len(history))
+                for start, end in zip(bounds[:-1], bounds[1:]):
+                    rows = history[start:end]
+                    self.history[str(rows["symbol"][0])] = deque(
+                        zip(rows["time"].tolist(), rows["price"].tolist()), maxlen=self.history_size)
+        return len(self.latest)
+
+    def record(self, symbol, price, timestamp=None):
+        """Record a live quote"""
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            self.latest[symbol] = (float(price), timestamp)
+            if symbol not in self.history:
+                self.history[symbol] = deque(maxlen=self.history_size)
+            self.history[symbol].append((timestamp, float(price)))
+            self._dirty = True
+
+    def recent_history(self, symbol):
+        """Get the recorded history of a symbol as an OHLCV frame"""
+        with self._lock:
+            points = list(self.history.get(symbol, ()))
+        times = np.array([t for t, _ in points], dtype=float)
+        close = np.array([p for _, p in points], dtype=float)
+        # Only closes are recorded, so each bar opens at the previous close
+        open_ = np.concatenate((close[:1], close[:-1]))
+        return pd.DataFrame({
+            "time": pd.to_datetime(times, unit="s"),
+            "open": open_,
+            "high": np.maximum(open_, close),
+            "low": np.minimum(open_, close),
+            "close": close,
+            "volume": np.zeros(len(close))
+        })
+
+    def checkpoint(self):
+        """Write the current quotes and history to disk"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            quotes = np.array([(symbol, price, timestamp) for symbol, (price, timestamp) in self.latest.items()],
+                              dtype=QUOTE_DTYPE)
+            history = np.array([(symbol, t, p) for symbol, points in self.history.items() for t, p in points],
+                               dtype=HISTORY_DTYPE)
+            self._dirty = False
+        os.makedirs(self.directory, exist_ok=True)
+        _atomic_save(self.history_path, history)
+        _atomic_save(self.quotes_path, quotes)
+        return True
+
+    def start(self):
+        """Start checkpointing in the background every interval seconds"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="snapshot-checkpoint", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.checkpoint()
+            except OSError:
+                self._dirty = True
+
+    def stop(self):
+        """Stop the background thread after a final checkpoint"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.checkpoint()